@@ -4,25 +4,27 @@ import json
 from todolist import Task,TaskManager
 from dailyplan import DailyPlanner
 
-# Load tasks
-with open("tasks.json", "r", encoding="utf-8") as f:
-    data = json.load(f)
-tasks = [Task.from_dict(task_dict) for task_dict in data]
+# Load tasks (edits go through task_manager so they can be undone)
+task_manager = TaskManager()
+task_manager.load_file()
+task_manager.build_index()  # index now so the first keystroke in the search box does not stall
+tasks = task_manager.tasks
 
 def save_tasks_to_json():
-    with open("tasks.json", "w", encoding="utf-8") as f:
-        json.dump([t.to_dict() for t in tasks], f, indent=2, ensure_ascii=False)
+    task_manager.save_file()
 
 def get_overall_progress():
     if not tasks:
         return 0
     return sum(t.get_progress() for t in tasks) / len(tasks)
 
-def on_toggle(task, var):
+def on_toggle(index, var):
     if var.get():
-        task.mark_completed()
+        task = task_manager.mark_completed(index)
     else:
-        task.completed = False
+        task = task_manager.mark_uncompleted(index)
+    if task is None:
+        return
     save_tasks_to_json()
     update_progress()
     print(f"{task.title} status updated")
@@ -55,6 +57,57 @@ def update_progress():
     progress_label.config(text=f"{percent:.1f}%")
 
 v = []
+rows = {}  # index string (e.g. "1" or "1.1") -> its checkbutton, for jumping to search results
+
+# Search box: results update as you type, selecting one scrolls to its row
+search_frame = ttk.Frame(todo_tab, padding=(10, 0))
+search_frame.pack(fill=X)
+
+ttk.Label(search_frame, text="Search:").pack(side=LEFT, padx=5)
+search_var = ttk.StringVar()
+search_entry = ttk.Entry(search_frame, textvariable=search_var)
+search_entry.pack(side=LEFT, fill=X, expand=True)
+
+search_results_list = ttk.Listbox(todo_tab, height=5)
+search_results = []
+search_job = None
+
+def update_search_results():
+    global search_job
+    search_job = None
+    search_results.clear()
+    search_results.extend(task_manager.search(search_var.get()))
+    search_results_list.delete(0, "end")
+    for index, task in search_results:
+        search_results_list.insert("end", f"{index}  {task.title} [{task.category}]")
+    if search_results:
+        search_results_list.pack(fill=X, padx=10, pady=5, after=search_frame)
+    else:
+        search_results_list.pack_forget()
+
+# Wait for a short pause in typing before searching
+def on_search_changed(*args):
+    global search_job
+    if search_job is not None:
+        root.after_cancel(search_job)
+    search_job = root.after(150, update_search_results)
+
+def go_to_row(index):
+    row = rows.get(index)
+    if row is None:
+        return
+    root.update_idletasks()
+    canvas.yview_moveto(row.winfo_y() / max(list_frame.winfo_height(), 1))
+    row.focus_set()
+
+def on_search_result_selected(event):
+    selection = search_results_list.curselection()
+    if selection:
+        go_to_row(search_results[selection[0]][0])
+
+search_var.trace_add("write", on_search_changed)
+search_entry.bind("<Return>", lambda event: search_results and go_to_row(search_results[0][0]))
+search_results_list.bind("<<ListboxSelect>>", on_search_result_selected)
 
 # To-Do list frame with scrollable canvas
 container_frame = ttk.Frame(todo_tab)
@@ -92,9 +145,10 @@ for i, task in enumerate(tasks):
         text=f"{i+1}. {task.title} ({task.estimated_time}min)  Due: {task.due_date}",
         variable=var,
         bootstyle="success",
-        command=lambda t=task, v=var: on_toggle(t, v)
+        command=lambda t=f"{i+1}", v=var: on_toggle(t, v)
     )
     cb.pack(anchor="w", padx=10, pady=3)
+    rows[f"{i+1}"] = cb
 
     for j, sub in enumerate(task.subtasks):
         svar = ttk.IntVar(value=sub.completed)
@@ -104,9 +158,10 @@ for i, task in enumerate(tasks):
         text=f"{i+1}.{j+1} {sub.title} ({sub.estimated_time}min)  Due: {sub.due_date}",
             variable=svar,
             bootstyle="success",
-            command=lambda t=sub, v=svar: on_toggle(t, v)
+            command=lambda t=f"{i+1}.{j+1}", v=svar: on_toggle(t, v)
         )
         scb.pack(anchor="w", padx=30, pady=1)
+        rows[f"{i+1}.{j+1}"] = scb
 
 # Add main task dialog
 def show_add_task_dialog():
@@ -138,7 +193,7 @@ def show_add_task_dialog():
         if not title or not est:
             return
         new_task = Task(title, category, est, due)
-        tasks.append(new_task)
+        task_manager.add_task(new_task)
         save_tasks_to_json()
         dialog.destroy()
         refresh_tasks()
@@ -176,7 +231,7 @@ def show_add_subtask_dialog():
                 return
             parent_task = tasks[idx]
             subtask = Task(title_var.get(), parent_task.category, time_var.get(), date_var.get())
-            parent_task.add_subtask(subtask)
+            task_manager.add_subtask(idx, subtask)
             save_tasks_to_json()
             dialog.destroy()
             refresh_tasks()
@@ -206,7 +261,7 @@ def show_delete_task_dialog():
                 sub_idx = int(sub_idx_str) - 1
                 if 0 <= main_idx < len(tasks):
                     if 0 <= sub_idx < len(tasks[main_idx].subtasks):
-                        del tasks[main_idx].subtasks[sub_idx]
+                        task_manager.delete_task(task_num)
                     else:
                         return
                 else:
@@ -214,7 +269,7 @@ def show_delete_task_dialog():
             else:
                 main_idx = int(task_num) - 1
                 if 0 <= main_idx < len(tasks):
-                    del tasks[main_idx]
+                    task_manager.delete_task(task_num)
                 else:
                     return
             save_tasks_to_json()
@@ -225,6 +280,25 @@ def show_delete_task_dialog():
 
     ttk.Button(dialog, text="Delete", bootstyle="danger", command=submit).pack(pady=10)
 
+# Undo / redo the last edit. The keyboard shortcuts are ignored while typing in a text field,
+# so Ctrl+Z there never undoes a task edit.
+def is_typing(event):
+    return event is not None and event.widget.winfo_class() in ("TEntry", "Entry", "Text")
+
+def undo_last_edit(event=None):
+    if is_typing(event):
+        return
+    if task_manager.undo():
+        save_tasks_to_json()
+        refresh_tasks()
+
+def redo_last_edit(event=None):
+    if is_typing(event):
+        return
+    if task_manager.redo():
+        save_tasks_to_json()
+        refresh_tasks()
+
 # Display buttons in one row
 button_frame = ttk.Frame(todo_tab)
 button_frame.pack(pady=10)
@@ -250,6 +324,23 @@ ttk.Button(
     command=show_delete_task_dialog
 ).pack(side=LEFT, padx=5)
 
+ttk.Button(
+    button_frame,
+    text="Undo",
+    bootstyle="secondary",
+    command=undo_last_edit
+).pack(side=LEFT, padx=5)
+
+ttk.Button(
+    button_frame,
+    text="Redo",
+    bootstyle="secondary",
+    command=redo_last_edit
+).pack(side=LEFT, padx=5)
+
+root.bind_all("<Control-z>", undo_last_edit)
+root.bind_all("<Control-y>", redo_last_edit)
+
 # Read template.json
 try:
     with open("template.json", "r", encoding="utf-8") as f:
@@ -336,6 +427,7 @@ def refresh_tasks():
     for widget in list_frame.winfo_children():
         widget.destroy()
     v.clear()
+    rows.clear()
     for i, task in enumerate(tasks):
         var = ttk.IntVar(value=task.completed)
         v.append(var)
@@ -344,9 +436,10 @@ def refresh_tasks():
             text=f"{i+1}. {task.title} ({task.estimated_time}min)  Due: {task.due_date}",
             variable=var,
             bootstyle="success",
-            command=lambda t=task, v=var: on_toggle(t, v)
+            command=lambda t=f"{i+1}", v=var: on_toggle(t, v)
         )
         cb.pack(anchor="w", padx=10, pady=3)
+        rows[f"{i+1}"] = cb
 
         for j, sub in enumerate(task.subtasks):
             svar = ttk.IntVar(value=sub.completed)
@@ -356,9 +449,12 @@ def refresh_tasks():
                 text=f"{i+1}.{j+1} {sub.title} ({sub.estimated_time}min)  Due: {sub.due_date}",
                 variable=svar,
                 bootstyle="success",
-                command=lambda t=sub, v=svar: on_toggle(t, v)
+                command=lambda t=f"{i+1}.{j+1}", v=svar: on_toggle(t, v)
             )
             scb.pack(anchor="w", padx=30, pady=1)
+            rows[f"{i+1}.{j+1}"] = scb
     update_progress()
+    # Row numbers may have shifted, so refresh any open search
+    update_search_results()
 
 root.mainloop()
@@ -0,0 +1,187 @@
+import heapq
+import re
+from collections import defaultdict
+from itertools import islice
+
+WORD_PATTERN = re.compile(r"\w+")
+# Most tasks a search ranks from a posting list before deciding it has enough results.
+MAX_SCAN = 5000
+
+# Split text into lowercase words.
+def split_words(text):
+    return WORD_PATTERN.findall(str(text or "").lower())
+
+# Trigrams of a word padded with '$' at the front, so 1-2 letter prefixes also map to a gram
+# (e.g. 'plan' -> '$$p', '$pl', 'pla', 'lan').
+def word_grams(word):
+    padded = "$$" + word
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+# Grams a query word must have: plain trigrams match anywhere in a word, shorter words match as a prefix.
+def query_grams(word):
+    if len(word) >= 3:
+        return {word[i:i + 3] for i in range(len(word) - 2)}
+    return word_grams(word)
+
+# Score how well a query word matches words joined as ' w1 w2 ': exact > prefix > substring > no match.
+# `patterns` is (' word ', ' word', 'word') so the checks stay plain substring tests.
+def match_score(patterns, text):
+    exact, prefix, substring = patterns
+    if exact in text:
+        return 3
+    elif prefix in text:
+        return 2
+    elif substring in text:
+        return 1
+    return 0
+
+# Inverted index from title/category trigrams to tasks, updated incrementally as tasks change.
+# Postings are dicts used as insertion-ordered sets, so every scan visits tasks in the same order.
+class TaskIndex:
+    def __init__(self):
+        self.postings = defaultdict(dict)  # gram -> {task: None} for tasks whose title or category contain it
+        # title word -> title word count -> {task: None}, so exact title matches can be read shortest first
+        self.title_words = defaultdict(dict)
+        # task -> (grams, ' title words ', ' category words ', title word count, parent, order added)
+        self.entries = {}
+        self._added = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    # Index a task and all of its subtasks; `parent` is the task it is a subtask of, if any.
+    def add(self, task, parent=None):
+        self._add_one(task, parent)
+        for subtask in task.subtasks:
+            self.add(subtask, task)
+
+    # Drop a task and all of its subtasks from the index.
+    def remove(self, task):
+        self._remove_one(task)
+        for subtask in task.subtasks:
+            self.remove(subtask)
+
+    # Re-index a single task after its title or category changed.
+    def update(self, task):
+        parent = self.parent_of(task)
+        self._remove_one(task)
+        self._add_one(task, parent)
+
+    # The task that an indexed task is a subtask of, or None for a top-level task.
+    def parent_of(self, task):
+        return self.entries[task][4]
+
+    def _add_one(self, task, parent):
+        title_words = split_words(task.title)
+        category_words = split_words(task.category)
+        grams = set()
+        for word in title_words + category_words:
+            grams |= word_grams(word)
+        for gram in grams:
+            self.postings[gram][task] = None
+        for word in set(title_words):
+            self.title_words[word].setdefault(len(title_words), {})[task] = None
+        self._added += 1
+        self.entries[task] = (grams, f" {' '.join(title_words)} ", f" {' '.join(category_words)} ",
+                              len(title_words), parent, self._added)
+
+    def _remove_one(self, task):
+        entry = self.entries.pop(task, None)
+        if entry is None:
+            return
+        grams, title_text, _, title_length, _, _ = entry
+        for gram in grams:
+            tasks = self.postings[gram]
+            del tasks[task]
+            if not tasks:
+                del self.postings[gram]
+        for word in set(title_text.split()):
+            buckets = self.title_words[word]
+            del buckets[title_length][task]
+            if not buckets[title_length]:
+                del buckets[title_length]
+            if not buckets:
+                del self.title_words[word]
+
+    # Return up to `limit` tasks matching every word of the query, best matches first.
+    # Any title match ranks above any category match; ties go to the shorter title, then the
+    # task indexed first.
+    # Tasks whose title contains every query word as a whole word have the top score and are
+    # always found. Beyond those, when even the rarest gram is in more than MAX_SCAN tasks,
+    # the first MAX_SCAN in posting order are ranked, falling back to all of them if that
+    # gives fewer than `limit` results.
+    def search(self, query, limit=20):
+        words = split_words(query)
+        if not words:
+            return []
+        patterns = [(f" {word} ", f" {word}", word) for word in words]
+
+        results = self._exact_title_matches(patterns, limit)
+        if len(results) >= limit:
+            return results
+
+        postings = []
+        for word in words:
+            for gram in query_grams(word):
+                tasks = self.postings.get(gram)
+                if not tasks:
+                    return results
+                postings.append(tasks)
+        postings.sort(key=len)
+        smallest, others = postings[0], postings[1:]
+
+        # Exact title matches are all in `results` already, so only the rest need ranking.
+        found = set(results)
+        wanted = limit - len(results)
+        if len(smallest) > MAX_SCAN:
+            candidates = [task for task in islice(smallest, MAX_SCAN)
+                          if task not in found and all(task in tasks for tasks in others)]
+            ranked = self._rank(candidates, patterns, wanted)
+            if len(ranked) >= wanted:
+                return results + ranked
+        # Intersect posting sets smallest first; a gram match may still be a false positive,
+        # which _rank filters out.
+        candidates = smallest.keys()
+        for tasks in others:
+            candidates = candidates & tasks.keys()
+        return results + self._rank(candidates - found, patterns, wanted)
+
+    # Tasks whose title has every query word as a whole word, shortest title first.
+    def _exact_title_matches(self, patterns, limit):
+        word_buckets = []
+        for _, _, word in patterns:
+            buckets = self.title_words.get(word)
+            if not buckets:
+                return []
+            word_buckets.append(buckets)
+        buckets = min(word_buckets, key=lambda buckets: sum(map(len, buckets.values())))
+
+        results = []
+        for title_length in sorted(buckets):
+            for task in buckets[title_length]:
+                title_text = self.entries[task][1]
+                if all(exact in title_text for exact, _, _ in patterns):
+                    results.append(task)
+                    if len(results) == limit:
+                        return results
+        return results
+
+    # Score candidate tasks against the query words and keep the best `limit` of them.
+    # Title matches score 4-6 and category matches 1-3 per word; a task missing any word is dropped.
+    def _rank(self, candidates, patterns, limit):
+        scored = []
+        for task in candidates:
+            _, title_text, category_text, title_length, _, order = self.entries[task]
+            score = 0
+            for word_patterns in patterns:
+                title_score = match_score(word_patterns, title_text)
+                if title_score:
+                    score += 3 + title_score
+                else:
+                    category_score = match_score(word_patterns, category_text)
+                    if not category_score:
+                        break
+                    score += category_score
+            else:
+                scored.append((score, -title_length, -order, task))
+        return [task for _, _, _, task in heapq.nlargest(limit, scored, key=lambda item: item[:3])]
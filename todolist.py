@@ -1,4 +1,6 @@
 import json
+from collections import deque
+from taskindex import TaskIndex, split_words
 
 # Represents a task with title, category, estimated time, due date, completion status, and subtasks.
 class Task:
@@ -60,10 +62,119 @@ class Task:
     def __str__(self):
         return f"{self.title} {self.due_date} {self.estimated_time}min"
 
-# Manages a collection of tasks, providing operations like add, delete, mark, and save/load.
+# Manages a collection of tasks, providing operations like add, delete, mark, search, undo/redo, and save/load.
 class TaskManager:
-    def __init__(self):
+    def __init__(self, history_limit=50):
         self.tasks = []
+        # Each history entry is an (undo, redo) pair of callables holding only the touched task,
+        # so an edit never copies the task list. The oldest entries are dropped past history_limit.
+        self.undo_stack = deque(maxlen=history_limit)
+        self.redo_stack = deque(maxlen=history_limit)
+        # Title/category search index, built by build_index (or the first search) and then
+        # kept in sync by _insert, _remove and _set_title.
+        self.index = None
+        # Top-level task -> (position, _moves when it was seen there). Each insert or remove in
+        # self.tasks shifts a task by at most one place, so a search only re-checks a small window.
+        self._positions = {}
+        self._moves = 0
+
+    # Remember how to revert and reapply an edit; a new edit invalidates anything that was undone.
+    def _record(self, undo, redo):
+        self.undo_stack.append((undo, redo))
+        self.redo_stack.clear()
+
+    # Resolve an index string (e.g. '1' or '1.1') to the list holding that task and its position in it.
+    # Returns (None, None) if the index does not point at an existing task.
+    def _locate(self, index):
+        parts = index.split(".")
+        task_index = int(parts[0]) - 1
+        if not 0 <= task_index < len(self.tasks):
+            return None, None
+        if len(parts) == 1:
+            return self.tasks, task_index
+        elif len(parts) == 2:
+            subtasks = self.tasks[task_index].subtasks
+            subtask_index = int(parts[1]) - 1
+            if 0 <= subtask_index < len(subtasks):
+                return subtasks, subtask_index
+        return None, None
+
+    # Put a task (and its subtasks) into a list at a position and index it.
+    # `parent` is the task whose subtasks `siblings` are, or None for the top-level list.
+    def _insert(self, siblings, position, task, parent=None):
+        siblings.insert(position, task)
+        if siblings is self.tasks:
+            self._moves += 1
+        if self.index is not None:
+            self.index.add(task, parent)
+            if siblings is self.tasks:
+                self._positions[task] = (position, self._moves)
+
+    # Take a task (and its subtasks) out of a list and out of the index.
+    def _remove(self, siblings, position):
+        task = siblings.pop(position)
+        if siblings is self.tasks:
+            self._moves += 1
+            self._positions.pop(task, None)
+        if self.index is not None:
+            self.index.remove(task)
+        return task
+
+    # Change a task's title and re-index it.
+    def _set_title(self, task, title):
+        task.title = title
+        if self.index is not None:
+            self.index.update(task)
+
+    # Current position of a top-level task, searched for only around where it was last seen.
+    def _position(self, task):
+        position, moves = self._positions[task]
+        drift = self._moves - moves
+        position = self.tasks.index(task, max(position - drift, 0), position + drift + 1)
+        self._positions[task] = (position, self._moves)
+        return position
+
+    # Index string (e.g. '2' or '2.1') of a task found by search, or None if it is nested deeper.
+    def _index_string(self, task):
+        parent = self.index.parent_of(task)
+        if parent is None:
+            return f"{self._position(task) + 1}"
+        if self.index.parent_of(parent) is not None:
+            return None
+        return f"{self._position(parent) + 1}.{parent.subtasks.index(task) + 1}"
+
+    # Set the completion status of a task or subtask and record the previous status for undo.
+    # Returns the task, or None if the index does not point at one.
+    def _set_completed(self, index, completed):
+        siblings, position = self._locate(index)
+        if siblings is None:
+            return None
+        task = siblings[position]
+        previous = task.completed
+        if previous == completed:
+            return task
+        task.completed = completed
+        self._record(lambda: setattr(task, "completed", previous),
+                     lambda: setattr(task, "completed", completed))
+        return task
+
+    # Revert the most recent edit. Returns False if there is nothing to undo.
+    def undo(self):
+        if not self.undo_stack:
+            return False
+        undo, redo = self.undo_stack.pop()
+        undo()
+        self.redo_stack.append((undo, redo))
+        return True
+
+    # Reapply the most recently undone edit. Returns False if there is nothing to redo.
+    def redo(self):
+        if not self.redo_stack:
+            return False
+        undo, redo = self.redo_stack.pop()
+        redo()
+        self.undo_stack.append((undo, redo))
+        return True
 
     # Calculate average progress across all tasks.
     def get_overall_progress(self):
@@ -95,41 +206,73 @@ class TaskManager:
 
     # Add a new task to the list.
     def add_task(self, task):
-        self.tasks.append(task)
+        position = len(self.tasks)
+        self._insert(self.tasks, position, task)
+        self._record(lambda: self._remove(self.tasks, position),
+                     lambda: self._insert(self.tasks, position, task))
 
     # Add a subtask to a specific task by index.
     def add_subtask(self, index, subtask):
-        self.tasks[index].add_subtask(subtask)
+        parent = self.tasks[index]
+        siblings = parent.subtasks
+        position = len(siblings)
+        self._insert(siblings, position, subtask, parent)
+        self._record(lambda: self._remove(siblings, position),
+                     lambda: self._insert(siblings, position, subtask, parent))
 
     # Mark a task or subtask as completed based on index string (e.g., '1' or '1.1').
+    # Returns the task, or None if the index is invalid.
     def mark_completed(self, index):
-        parts = index.split(".")
-        task_index = int(parts[0]) - 1
-        if len(parts) == 1:
-            self.tasks[task_index].mark_completed()
-        elif len(parts) == 2:
-            subtask_index = int(parts[1]) - 1
-            self.tasks[task_index].subtasks[subtask_index].mark_completed()
+        return self._set_completed(index, True)
 
     # Mark a task or subtask as uncompleted based on index string.
+    # Returns the task, or None if the index is invalid.
     def mark_uncompleted(self, index):
-        parts = index.split(".")
-        task_index = int(parts[0]) - 1
-        if len(parts) == 1:
-            self.tasks[task_index].completed = False
-        elif len(parts) == 2:
-            subtask_index = int(parts[1]) - 1
-            self.tasks[task_index].subtasks[subtask_index].completed = False
+        return self._set_completed(index, False)
 
     # Delete a task or subtask based on index string.
     def delete_task(self, index):
-        parts = index.split(".")
-        task_index = int(parts[0]) - 1
-        if len(parts) == 1:
-            self.tasks.pop(task_index)
-        if len(parts) == 2:
-            subtask_index = int(parts[1]) - 1
-            self.tasks[task_index].subtasks.pop(subtask_index)
+        siblings, position = self._locate(index)
+        if siblings is None:
+            return
+        parent = None if siblings is self.tasks else self.tasks[int(index.split(".")[0]) - 1]
+        task = self._remove(siblings, position)
+        self._record(lambda: self._insert(siblings, position, task, parent),
+                     lambda: self._remove(siblings, position))
+
+    # Rename a task or subtask based on index string.
+    def rename_task(self, index, title):
+        siblings, position = self._locate(index)
+        if siblings is None:
+            return
+        task = siblings[position]
+        previous = task.title
+        self._set_title(task, title)
+        self._record(lambda: self._set_title(task, previous),
+                     lambda: self._set_title(task, title))
+
+    # Build the search index up front, e.g. before a GUI starts taking input, so the first
+    # search does not have to. Otherwise it is built by the first search.
+    def build_index(self):
+        self.index = TaskIndex()
+        self._positions = {}
+        for position, task in enumerate(self.tasks):
+            self.index.add(task)
+            self._positions[task] = (position, self._moves)
+
+    # Find tasks and subtasks whose title or category match the query, best matches first.
+    # Returns (index string, task) pairs, e.g. ('2.1', <Task>), so a result can be located in the list.
+    def search(self, query, limit=20):
+        if not split_words(query):
+            return []
+        if self.index is None:
+            self.build_index()
+        results = []
+        for task in self.index.search(query, limit):
+            index = self._index_string(task)
+            if index is not None:
+                results.append((index, task))
+        return results
 
     # Save all tasks to a JSON file.
     def save_file(self, filename="tasks.json"):
@@ -145,6 +288,10 @@ class TaskManager:
             self.tasks = [Task.from_dict(task_dict) for task_dict in data]
         except FileNotFoundError:
             self.tasks = []
+        self.index = None
+        self._positions = {}
+        self.undo_stack.clear()
+        self.redo_stack.clear()
 
 # Main interactive loop for the to-do list application.
 def main():
@@ -160,7 +307,11 @@ def main():
         print("3. Mark completed")
         print("4. Mark uncompleted")
         print("5. Delete a task")
-        print("6. Exit")
+        print("6. Rename a task")
+        print("7. Search tasks")
+        print("8. Undo")
+        print("9. Redo")
+        print("10. Exit")
         choice = input("Enter your choice: ")
 
         if choice == "1":
@@ -201,6 +352,32 @@ def main():
             todolist.save_file()
             continue
         elif choice == "6":
+            index = input("Enter your task's index [like 1 or 1.1]: ")
+            title = input("Enter your task's new title: ")
+            todolist.rename_task(index, title)
+            todolist.list_tasks()
+            todolist.save_file()
+            continue
+        elif choice == "7":
+            query = input("Enter search words: ")
+            results = todolist.search(query)
+            if not results:
+                print("No matching tasks")
+            for index, task in results:
+                print(f"   {index} {task} [{task.category}]")
+            input("Press Enter to continue...")
+            continue
+        elif choice == "8":
+            if not todolist.undo():
+                print("Nothing to undo")
+            todolist.save_file()
+            continue
+        elif choice == "9":
+            if not todolist.redo():
+                print("Nothing to redo")
+            todolist.save_file()
+            continue
+        elif choice == "10":
             break
 
 